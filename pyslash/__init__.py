@@ -5,7 +5,8 @@ from discord_slash.utils import manage_commands
 
 # Export own functions and classes
 from .client import SlashCommand
-from .converters import convert
+from .converters import convert, validate
 from .decorators import slash, slash_cog
+from .guilds import LazyGuildSync
 
 __version__ = "1.2.2"
@@ -1,16 +1,20 @@
+import asyncio
 from typing import List, Optional, Union
 import discord
 from discord.ext import commands
 from discord_slash import SlashCommand as SlashCommandOriginal
 
 from .decorators import slash
+from .guilds import LazyGuildSync
+from .profiler import profiler
 
 
 class SlashCommand(SlashCommandOriginal):
-    def __init__(self, client: Union[discord.Client, commands.Bot], sync_commands: bool = False, delete_from_unused_guilds: bool = False, sync_on_cog_reload: bool = False, override_type: bool = False, application_id: Optional[int] = None, guild_ids: Optional[List[int]] = None):
+    def __init__(self, client: Union[discord.Client, commands.Bot], sync_commands: bool = False, delete_from_unused_guilds: bool = False, sync_on_cog_reload: bool = False, override_type: bool = False, application_id: Optional[int] = None, guild_ids: Optional[List[int]] = None, profile: Union[bool, str] = False, guild_sync: Optional[LazyGuildSync] = None):
         """
         Create a SlashCommand manager. As per normal usage, but contains the
-        following extra parameter to allow general guild ID setting.
+        following extra parameters to allow general guild ID setting,
+        profiling and lazy guild command registration.
 
         .. note::
             Other information can be seen on the original
@@ -20,12 +24,80 @@ class SlashCommand(SlashCommandOriginal):
         ----------
         guild_ids : Optional[List[int]], optional
             Default value for guild_ids for commands, by default None
+        profile : Union[bool, str], optional
+            Whether to profile command registration, by default False
+
+            If a string is provided, it is used as the path (without
+            extension) to write the reports to. The reports are written once
+            the client is ready and commands have been synced. Profiling can
+            also be enabled with the `PYSLASH_PROFILE` environment variable,
+            which also includes commands decorated before this is created.
+        guild_sync : Optional[LazyGuildSync], optional
+            Strategy to register guild commands lazily when syncing, by
+            default None (all guilds are synced up front)
+
+            This requires a `commands.Bot`, and replaces
+            `delete_from_unused_guilds` as guilds that no longer have
+            commands are unregistered by the strategy.
         """
         super().__init__(client, sync_commands=sync_commands, delete_from_unused_guilds=delete_from_unused_guilds, sync_on_cog_reload=sync_on_cog_reload, override_type=override_type, application_id=application_id)
 
         # Set value (publicly accessible as it can be overridden later if
         # desired)
         self.guild_ids = guild_ids
+
+        self.guild_sync = guild_sync
+        if self.guild_sync is not None:
+            if self.has_listener:
+                self.guild_sync.attach(self)
+            else:
+                self.logger.warning("Lazy guild registration requires `commands.Bot`, syncing all guilds instead.")
+                self.guild_sync = None
+
+        self._synced = asyncio.Event()
+        if profile:
+            profiler.enable(profile if isinstance(profile, str) else None)
+        if profiler.enabled:
+            self._profile_requests()
+            self._discord.loop.create_task(self._write_profile())
+
+    def _profile_requests(self):
+        """
+        Wrap the command requests so that each is recorded by the profiler
+        """
+        command_request = self.req.command_request
+
+        async def profiled_command_request(method, guild_id, url_ending="", **kwargs):
+            with profiler.record("sync", f"{method} {guild_id or 'global'}{url_ending}"):
+                return await command_request(method, guild_id, url_ending, **kwargs)
+
+        self.req.command_request = profiled_command_request
+
+    async def _write_profile(self):
+        """
+        Write the profiler reports once ready (and synced, including guilds
+        synced in the background, if syncing)
+        """
+        await self._discord.wait_until_ready()
+        if self.sync_commands:
+            await self._synced.wait()
+            # Guilds are registered in the background when syncing lazily
+            if self.guild_sync is not None:
+                await self.guild_sync.join()
+
+        profiler.write_report()
+        # Startup is over, so there's no need to keep paying for tracing
+        profiler.disable()
+        self.logger.info(f"Wrote registration profile to {profiler.path}")
+
+    async def sync_all_commands(self, delete_from_unused_guilds=False):
+        try:
+            if self.guild_sync is None:
+                await super().sync_all_commands(delete_from_unused_guilds)
+            else:
+                await self.guild_sync.sync(await self.to_dict())
+        finally:
+            self._synced.set()
     
     def slash(self, name: str = None, description: str = None, guild_ids: List[int] = None, remove_underscore_keywords: bool = True):
         """
@@ -1,9 +1,16 @@
-from typing import Any, Callable, Dict, Union
+from typing import Any, Callable, Dict, List, Union
 import discord
 
 from discord.ext import commands
 from discord.ext.commands.errors import BadArgument
 from discord_slash import SlashContext
+from discord_slash.model import SlashCommandOptionType
+
+# Discord only accepts integers within the range of a double
+MIN_INTEGER = -2 ** 53
+MAX_INTEGER = 2 ** 53
+# Discord's maximum length of a string option
+MAX_STRING_LENGTH = 6000
 
 
 class BadSlashArgument(commands.BadArgument):
@@ -133,3 +140,150 @@ def convert(send_on_raise: bool = False, **converters: Dict[str, commands.Conver
         wrapper.__annotations__ = function.__annotations__
         return wrapper
     return decorator
+
+
+def _is_string(value: Any) -> bool:
+    return isinstance(value, str)
+
+
+def _is_integer(value: Any) -> bool:
+    # Booleans subclass integers, so they must be excluded explicitly
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_boolean(value: Any) -> bool:
+    return isinstance(value, bool)
+
+
+def _is_snowflake(value: Any) -> bool:
+    # Users, channels and roles are passed as discord.py models when they
+    # could be resolved, otherwise as IDs (ints, or strings outside of guilds).
+    # Uncached channels and roles are passed as None, as the guild's getters
+    # don't raise.
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.isdigit()
+    return _is_integer(value) or isinstance(getattr(value, "id", None), int)
+
+
+OPTION_TYPE_CHECKS = {
+    SlashCommandOptionType.STRING: _is_string,
+    SlashCommandOptionType.INTEGER: _is_integer,
+    SlashCommandOptionType.BOOLEAN: _is_boolean,
+    SlashCommandOptionType.USER: _is_snowflake,
+    SlashCommandOptionType.CHANNEL: _is_snowflake,
+    SlashCommandOptionType.ROLE: _is_snowflake,
+}
+
+
+def compile_validator(options: List[dict], connector: Dict[str, str] = None) -> Callable[[Dict[str, Any]], None]:
+    """
+    Compile a validator for the given options, as generated by
+    `get_slash_kwargs`. All lookups are done up front, so validating a call
+    is a single pass over the options without any reflection.
+
+    .. note::
+        The options generated by `get_slash_kwargs` have no length or range
+        metadata, so by default strings are limited to Discord's maximum
+        length and integers to Discord's range. If an option has
+        `min_length`/`max_length` (strings) or `min_value`/`max_value`
+        (integers), those are used instead.
+
+    Parameters
+    ----------
+    options : List[dict]
+        The options of the command
+    connector : Dict[str, str], optional
+        Mapping of option names to argument names, by default None
+
+    Returns
+    -------
+    Callable[[Dict[str, Any]], None]
+        The validator, which takes the keyword arguments of a call and raises
+        `BadSlashArgument` if they are invalid
+    """
+    connector = connector or {}
+    checks = []
+    for option in options:
+        key = connector.get(option["name"], option["name"])
+        choices = frozenset(choice["value"] for choice in option["choices"]) \
+            if option.get("choices") else None
+
+        # Bounds are on the length of strings and the value of integers
+        bounds = None
+        if option["type"] == SlashCommandOptionType.STRING:
+            bounds = (len, option.get("min_length", 0),
+                      option.get("max_length", MAX_STRING_LENGTH))
+        elif option["type"] == SlashCommandOptionType.INTEGER:
+            bounds = (None, option.get("min_value", MIN_INTEGER),
+                      option.get("max_value", MAX_INTEGER))
+
+        checks.append((
+            key,
+            option.get("required", False),
+            OPTION_TYPE_CHECKS.get(option["type"]),
+            choices,
+            bounds
+        ))
+
+    known = frozenset(key for key, *_ in checks)
+
+    def validator(kwargs: Dict[str, Any]):
+        # Options that no longer exist (for example, a stale client that
+        # hasn't received the new schema yet)
+        for key in kwargs:
+            if key not in known:
+                raise BadSlashArgument(message=f"Unknown argument {key}")
+
+        for key, required, type_check, choices, bounds in checks:
+            if key not in kwargs:
+                if required:
+                    raise BadSlashArgument(message=f"Argument {key} is required")
+                continue
+
+            value = kwargs[key]
+            if type_check is not None and not type_check(value):
+                raise BadSlashArgument(message=f"Argument {key} is not of a valid type")
+            if choices is not None and value not in choices:
+                raise BadSlashArgument(message=f"Argument {key} is not a valid choice")
+            if bounds is not None:
+                measure, lower, upper = bounds
+                size = measure(value) if measure is not None else value
+                if not lower <= size <= upper:
+                    raise BadSlashArgument(message=f"Argument {key} is out of range")
+
+    return validator
+
+
+def validate(options: List[dict], connector: Dict[str, str] = None, send_on_raise: bool = False):
+    """
+    Wraps slash commands to validate the arguments against the options of the
+    command before anything else (such as `convert`) is run.
+
+    Parameters
+    ----------
+    options : List[dict]
+        The options of the command
+    connector : Dict[str, str], optional
+        Mapping of option names to argument names, by default None
+    send_on_raise : bool
+        Whether to send an epheremal message with the error message on failure,
+        by default False
+    """
+    validator = compile_validator(options, connector)
+
+    def decorator(function):
+        async def wrapper(self_or_ctx, *args, **kwargs):
+            try:
+                validator(kwargs)
+            except BadArgument as exc:
+                if send_on_raise:
+                    ctx = self_or_ctx if isinstance(self_or_ctx, SlashContext) else args[0]
+                    await ctx.send(str(exc), hidden=True)
+                raise exc
+
+            await function(self_or_ctx, *args, **kwargs)
+        wrapper.__annotations__ = function.__annotations__
+        return wrapper
+    return decorator
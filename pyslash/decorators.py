@@ -3,7 +3,8 @@ from typing import List
 
 from discord_slash import SlashCommand, cog_ext
 
-from .converters import convert
+from .converters import convert, validate
+from .profiler import profiler
 from .utils import *
 
 
@@ -24,10 +25,13 @@ def slash_cog(name: str = None, description: str = None, guild_ids: List[int] =
         by default True
     """
     def decorator(function):
-        # Use annotations
-        params, converter_params = get_slash_kwargs(
-            function, name, description, guild_ids, remove_underscore_keywords)
-        return cog_ext.cog_slash(**params)(convert(**converter_params)(function))
+        with profiler.record("decoration", name or function.__name__):
+            # Use annotations
+            params, converter_params = get_slash_kwargs(
+                function, name, description, guild_ids, remove_underscore_keywords)
+            return cog_ext.cog_slash(**params)(
+                validate(params['options'], params['connector'])(
+                    convert(**converter_params)(function)))
 
     return decorator
 
@@ -51,9 +55,12 @@ def slash(slash_class: SlashCommand, name: str = None, description: str = None,
         by default True
     """
     def decorator(function):
-        # Use annotations
-        params, converter_params = get_slash_kwargs(
-            function, name, description, guild_ids, remove_underscore_keywords)
-        return slash_class.slash(**params)(convert(**converter_params)(function))
+        with profiler.record("decoration", name or function.__name__):
+            # Use annotations
+            params, converter_params = get_slash_kwargs(
+                function, name, description, guild_ids, remove_underscore_keywords)
+            return slash_class.slash(**params)(
+                validate(params['options'], params['connector'])(
+                    convert(**converter_params)(function)))
 
     return decorator
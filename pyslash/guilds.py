@@ -0,0 +1,364 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import discord
+
+# Key used in the registry for global commands
+GLOBAL_SCOPE = "global"
+
+logger = logging.getLogger("pyslash")
+
+
+def hash_commands(commands: List[dict]) -> str:
+    """
+    Hash a list of commands, so that changes can be detected without
+    requesting the commands from Discord
+
+    Parameters
+    ----------
+    commands : List[dict]
+        The commands, as given by `SlashCommand.to_dict`
+
+    Returns
+    -------
+    str
+        The hash
+    """
+    return hashlib.sha256(
+        json.dumps(commands, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class LazyGuildSync:
+    """
+    Registration strategy that registers guild commands in the background
+    when each guild becomes available (or is joined), rather than for every
+    guild up front.
+
+    What is registered is recorded in a file, so that guilds that are
+    already up to date are skipped after a restart. Guilds are registered
+    by a limited number of workers, most recently active guilds first.
+    If `idle_timeout` is given, commands are unregistered from guilds that
+    have been inactive for that long, and registered again on activity.
+
+    .. note::
+        The record is trusted, so commands changed on Discord by anything
+        else will not be noticed. Delete the file to force a full sync.
+    """
+
+    def __init__(self, path: str = "pyslash_guilds.json", max_concurrency: int = 5, idle_timeout: Optional[float] = None, idle_check_interval: float = 3600, retry_after: float = 3600):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Path of the file to record registered commands in, by default
+            "pyslash_guilds.json"
+        max_concurrency : int, optional
+            Maximum number of guilds to register at once, by default 5
+        idle_timeout : Optional[float], optional
+            Seconds without activity after which a guild's commands are
+            unregistered, by default None (never)
+        idle_check_interval : float, optional
+            Seconds between checks for idle guilds, by default 3600
+        retry_after : float, optional
+            Seconds to wait before retrying a guild that failed to register,
+            by default 3600
+
+            Guilds where the bot is missing access are only retried when
+            their commands change or the guild is joined again.
+        """
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self.idle_check_interval = idle_check_interval
+        self.retry_after = retry_after
+
+        # scope: {"hash": hash of registered commands, "last_active": time,
+        #         "failed": hash that failed to register,
+        #         "retry_at": time to retry it, or None to not retry}
+        self.registry = self.load()
+        self.guild_commands = {}
+        self.slash = None
+
+        # Hashes of guild_commands, so activity can be checked cheaply
+        self._hashes = {}
+
+        self._queue = None
+        self._pending = set()
+        self._workers = []
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the registry from `path`
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            The registry, or an empty registry if there is no file or it is
+            corrupt (forcing a full sync)
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            logger.warning(f"Guild registry {self.path} is corrupt, syncing all guilds")
+            return {}
+
+    def save(self):
+        """
+        Save the registry to `path`. This is written to a temporary file
+        first, so that the registry is never left partially written.
+        Failures are logged rather than raised, as the registry can always
+        be rebuilt by syncing again.
+        """
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                json.dump(self.registry, f)
+            os.replace(temporary_path, self.path)
+        except OSError as exc:
+            logger.error(f"Failed to save guild registry {self.path}: {exc}")
+
+    def attach(self, slash):
+        """
+        Attach to a `SlashCommand`, listening for guild events and activity
+
+        Parameters
+        ----------
+        slash : SlashCommand
+            The slash object to register commands for
+        """
+        self.slash = slash
+        for event in ("on_guild_available", "on_guild_join", "on_guild_remove", "on_message", "on_slash_command"):
+            slash._discord.add_listener(getattr(self, event), event)
+
+        default_close = slash._discord.close
+
+        async def override_close():
+            try:
+                self.close()
+            finally:
+                await default_close()
+
+        slash._discord.close = override_close
+
+    def close(self):
+        """
+        Stop registering guilds, and save the registry
+        """
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+        self._queue = None
+        self._pending.clear()
+        self.save()
+
+    async def join(self):
+        """
+        Wait until every queued guild has been synced
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    def is_idle(self, guild_id: int) -> bool:
+        """
+        Whether a guild has been inactive for longer than `idle_timeout`
+        """
+        if self.idle_timeout is None:
+            return False
+
+        last_active = self.registry.get(str(guild_id), {}).get("last_active", time.time())
+        return time.time() - last_active > self.idle_timeout
+
+    def get_commands(self, guild_id: int) -> List[dict]:
+        """
+        Get the commands that should be registered to a guild, which is
+        none if the guild is idle
+        """
+        if self.is_idle(guild_id):
+            return []
+        return self.guild_commands.get(guild_id, [])
+
+    def get_hash(self, guild_id: int) -> Optional[str]:
+        """
+        Get the hash of the commands that should be registered to a guild,
+        or None if there are none
+        """
+        if self.is_idle(guild_id):
+            return None
+        return self._hashes.get(guild_id)
+
+    def needs_sync(self, guild_id: int) -> bool:
+        """
+        Whether the commands registered to a guild are out of date, and
+        haven't recently failed to register
+        """
+        entry = self.registry.get(str(guild_id), {})
+        expected = self.get_hash(guild_id)
+        if entry.get("hash") == expected:
+            return False
+
+        if "failed" in entry and entry["failed"] == expected:
+            retry_at = entry.get("retry_at")
+            return retry_at is not None and time.time() >= retry_at
+
+        return True
+
+    def touch(self, guild_id: int):
+        """
+        Mark a guild as active, scheduling it if it needs its commands
+        registered again
+        """
+        self.registry.setdefault(str(guild_id), {})["last_active"] = time.time()
+        self.schedule(guild_id)
+
+    def schedule(self, guild_id: int):
+        """
+        Queue a guild to be synced, if syncing has started and it is out of
+        date. More recently active guilds are synced first.
+        """
+        if self._queue is None or guild_id in self._pending or not self.needs_sync(guild_id):
+            return
+
+        last_active = self.registry.get(str(guild_id), {}).get("last_active", 0)
+        self._pending.add(guild_id)
+        self._queue.put_nowait((-last_active, guild_id))
+
+    async def register(self, scope: str, guild_id: Optional[int], commands: List[dict]):
+        """
+        Register commands to a scope, unless the registry shows they are
+        already registered
+
+        Parameters
+        ----------
+        scope : str
+            The key of the scope in the registry
+        guild_id : Optional[int]
+            The guild to register to, or None for global commands
+        commands : List[dict]
+            The commands to register
+        """
+        entry = self.registry.setdefault(scope, {})
+        hash_ = hash_commands(commands) if commands else None
+        if entry.get("hash") == hash_:
+            return
+
+        await self.slash.req.put_slash_commands(slash_commands=commands, guild_id=guild_id)
+        entry["hash"] = hash_
+        entry.pop("failed", None)
+        entry.pop("retry_at", None)
+
+    async def sync(self, cmds: Dict[str, Any]):
+        """
+        Register global commands, then start registering guild commands in
+        the background. Called by `SlashCommand.sync_all_commands`.
+
+        Parameters
+        ----------
+        cmds : Dict[str, Any]
+            The commands, as given by `SlashCommand.to_dict`
+        """
+        await self.register(GLOBAL_SCOPE, None, cmds["global"])
+        self.guild_commands = cmds["guild"]
+        self._hashes = {
+            guild_id: hash_commands(commands)
+            for guild_id, commands in self.guild_commands.items() if commands
+        }
+
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+            loop = self.slash._discord.loop
+            self._workers = [loop.create_task(self.worker()) for _ in range(self.max_concurrency)]
+            if self.idle_timeout is not None:
+                self._workers.append(loop.create_task(self.check_idle()))
+
+        for guild in self.slash._discord.guilds:
+            self.registry.setdefault(str(guild.id), {}).setdefault("last_active", time.time())
+            self.schedule(guild.id)
+
+        self.save()
+
+    async def worker(self):
+        """
+        Register commands to queued guilds, one at a time
+        """
+        # Kept, as the queue is dropped on close
+        queue = self._queue
+        while True:
+            _, guild_id = await queue.get()
+            expected = self.get_hash(guild_id)
+            try:
+                await self.register(str(guild_id), guild_id, self.get_commands(guild_id))
+            except discord.Forbidden:
+                if self.slash._discord.get_guild(guild_id) is None:
+                    # Removed while offline, so there's nothing to register
+                    # to (or unregister from)
+                    self.registry.pop(str(guild_id), None)
+                else:
+                    logger.warning(f"Missing access to register commands in guild {guild_id}")
+                    # Retrying would fail again until something changes
+                    self.set_failed(guild_id, expected, None)
+            except Exception as exc:
+                logger.error(f"Failed to register commands in guild {guild_id}: {exc}")
+                self.set_failed(guild_id, expected, time.time() + self.retry_after)
+            finally:
+                # Only once registered, so activity during the request
+                # doesn't queue the guild again
+                self._pending.discard(guild_id)
+                queue.task_done()
+
+            if queue.empty():
+                self.save()
+
+    def set_failed(self, guild_id: int, hash_: Optional[str], retry_at: Optional[float]):
+        """
+        Record that registering commands to a guild failed, so it isn't
+        retried until `retry_at` (or at all if None) unless its commands
+        change
+        """
+        entry = self.registry.setdefault(str(guild_id), {})
+        entry["failed"] = hash_
+        entry["retry_at"] = retry_at
+
+    async def check_idle(self):
+        """
+        Periodically schedule idle guilds so their commands are unregistered
+        """
+        while True:
+            await asyncio.sleep(self.idle_check_interval)
+            for scope, entry in list(self.registry.items()):
+                if scope != GLOBAL_SCOPE and entry.get("hash") is not None:
+                    self.schedule(int(scope))
+            self.save()
+
+    async def on_guild_available(self, guild: discord.Guild):
+        self.registry.setdefault(str(guild.id), {}).setdefault("last_active", time.time())
+        self.schedule(guild.id)
+
+    async def on_guild_join(self, guild: discord.Guild):
+        # Access may have changed (such as being invited with the
+        # applications.commands scope), so retry any failures
+        entry = self.registry.setdefault(str(guild.id), {})
+        entry.pop("failed", None)
+        entry.pop("retry_at", None)
+        self.touch(guild.id)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        # Commands can't be unregistered without access, so forget them
+        # and register again if the guild is rejoined
+        self.registry.pop(str(guild.id), None)
+
+    async def on_message(self, message: discord.Message):
+        if message.guild is not None:
+            self.touch(message.guild.id)
+
+    async def on_slash_command(self, ctx):
+        if ctx.guild_id is not None:
+            self.touch(ctx.guild_id)
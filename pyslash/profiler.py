@@ -0,0 +1,217 @@
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import environ
+from typing import Dict, List, Optional
+
+# Setting this environment variable (to anything other than "0") enables
+# profiling from import time, so that decorators in cogs are also profiled
+PROFILE_ENV = "PYSLASH_PROFILE"
+# Path (without extension) to write the reports to
+PROFILE_PATH_ENV = "PYSLASH_PROFILE_PATH"
+DEFAULT_PROFILE_PATH = "pyslash_profile"
+
+# Categories of the records the current task is within, so that concurrent
+# records in other tasks (such as sync workers) aren't considered nested
+_record_stack = ContextVar("pyslash_record_stack", default=())
+
+
+class Profiler:
+    """
+    Records how long command registration takes, and how much memory it
+    allocates. Decorations, each phase of `get_slash_kwargs` and each sync
+    request are recorded.
+
+    .. note::
+        Only things that happen after the profiler is enabled are recorded,
+        so use the environment variable to include commands decorated before
+        `SlashCommand` is created.
+
+    .. note::
+        Memory is the peak traced memory above the start of each record.
+        Sync requests are awaited, so their memory covers everything running
+        on the event loop at the time, not just the request.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = DEFAULT_PROFILE_PATH
+        self.records = []
+
+        # Records that haven't finished, with the peak memory seen so far
+        self._open = []
+        # Whether tracemalloc was started by (and so should be stopped by)
+        # the profiler
+        self._started_tracing = False
+
+    def enable(self, path: Optional[str] = None):
+        """
+        Start recording
+
+        Parameters
+        ----------
+        path : Optional[str], optional
+            Path (without extension) to write the reports to, by default None
+        """
+        self.enabled = True
+        self.path = path or self.path
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def disable(self):
+        """
+        Stop recording, stopping tracemalloc if it was started by `enable`
+        """
+        self.enabled = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _update_peaks(self):
+        """
+        Add the current peak to every open record, then reset the peak so
+        that a new record starts from the current memory
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        for open_record in self._open:
+            open_record["peak"] = max(open_record["peak"], peak)
+
+        # Python < 3.9 can't reset the peak, so only the change in memory is
+        # measured (clamped to zero)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def record(self, category: str, name: str, phase: Optional[str] = None):
+        """
+        Record the time and memory taken by the body of the `with` statement
+
+        Parameters
+        ----------
+        category : str
+            The category, one of "decoration", "phase" or "sync"
+        name : str
+            The name of the command or request
+        phase : Optional[str], optional
+            The phase of the command, by default None
+        """
+        if not self.enabled:
+            yield
+            return
+
+        self._update_peaks()
+        memory = tracemalloc.get_traced_memory()[0]
+        # Nested records (such as choices within options) are left out of
+        # the total of their category, so they aren't counted twice
+        stack = _record_stack.get()
+        nested = category in stack
+        token = _record_stack.set(stack + (category,))
+        open_record = dict(category=category, peak=memory)
+        self._open.append(open_record)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._update_peaks()
+            self._open.remove(open_record)
+            _record_stack.reset(token)
+            if hasattr(tracemalloc, "reset_peak"):
+                allocated = open_record["peak"] - memory
+            else:
+                allocated = tracemalloc.get_traced_memory()[0] - memory
+
+            self.records.append(dict(
+                category=category,
+                name=name,
+                phase=phase,
+                nested=nested,
+                duration=duration,
+                allocated=max(allocated, 0)
+            ))
+
+    def summary(self) -> Dict[str, List[dict]]:
+        """
+        Summarise the records, adding together records of the same category,
+        name and phase
+
+        Returns
+        -------
+        Dict[str, List[dict]]
+            The summarised records for each category, slowest first
+        """
+        totals = defaultdict(lambda: dict(duration=0.0, allocated=0, count=0, nested=True))
+        for record in self.records:
+            total = totals[record["category"], record["name"], record["phase"]]
+            total["duration"] += record["duration"]
+            total["allocated"] += record["allocated"]
+            total["count"] += 1
+            # Only nested if every record is
+            total["nested"] = total["nested"] and record["nested"]
+
+        summary = defaultdict(list)
+        for (category, name, phase), total in totals.items():
+            summary[category].append(dict(name=name, phase=phase, **total))
+
+        for items in summary.values():
+            items.sort(key=lambda item: item["duration"], reverse=True)
+
+        return dict(summary)
+
+    def format_report(self) -> str:
+        """
+        Format the summary as text
+
+        Returns
+        -------
+        str
+            The report
+        """
+        totals = defaultdict(float)
+        for record in self.records:
+            if not record["nested"]:
+                totals[record["category"]] += record["duration"]
+
+        lines = []
+        for category, items in self.summary().items():
+            lines.append(f"{category} ({totals[category] * 1000:.2f} ms)")
+            for item in items:
+                name = item["name"] if item["phase"] is None \
+                    else f"{item['name']} [{item['phase']}]"
+                if item["nested"]:
+                    name += " (nested)"
+                lines.append(
+                    f"  {item['duration'] * 1000:10.2f} ms  {item['allocated']:>10} B  "
+                    f"x{item['count']:<4} {name}")
+            lines.append("")
+
+        return "\n".join(lines)
+
+    def write_report(self, path: Optional[str] = None):
+        """
+        Write the report as text and JSON, to `path` with .txt and .json
+        extensions respectively
+
+        Parameters
+        ----------
+        path : Optional[str], optional
+            Path (without extension) to write the reports to, by default the
+            path given to `enable`
+        """
+        path = path or self.path
+        with open(f"{path}.txt", "w", encoding="utf-8") as f:
+            f.write(self.format_report())
+
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+profiler = Profiler()
+
+if environ.get(PROFILE_ENV, "0") not in ("", "0"):
+    profiler.enable(environ.get(PROFILE_PATH_ENV))
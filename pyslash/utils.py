@@ -10,6 +10,8 @@ from discord_slash.utils.manage_commands import create_choice, create_option
 from docstring_parser import parse
 from docstring_parser.common import DocstringParam
 
+from .profiler import profiler
+
 
 class InvalidParameter(CommandError):
     pass
@@ -175,10 +177,14 @@ def get_slash_kwargs(function: Any, name: str = None, description: str = None, g
     dict
         The connectors for the parameter names
     """
+    command_name = name or function.__name__
+
     # Use annotations
-    signature = inspect.signature(function)
+    with profiler.record("phase", command_name, "signature"):
+        signature = inspect.signature(function)
     # Use docstring signatures to get descriptions
-    parsed_docstring = parse(function.__doc__)
+    with profiler.record("phase", command_name, "docstring"):
+        parsed_docstring = parse(function.__doc__)
     # Command description
     description = description or parsed_docstring.short_description
     # Parameter descriptions
@@ -186,7 +192,7 @@ def get_slash_kwargs(function: Any, name: str = None, description: str = None, g
 
     # Building params for function
     params = dict(
-        name=name or function.__name__,
+        name=command_name,
         description=description or "No description",
         guild_ids=guild_ids,
         options=[]
@@ -194,47 +200,49 @@ def get_slash_kwargs(function: Any, name: str = None, description: str = None, g
     param_name_mapping = dict()
     converter_params = dict()
 
-    for param_name, parameter in signature.parameters.items():
-        annotation = parameter.annotation
-        if annotation == SlashContext or param_name == "self":
-            continue
-
-        # If it's a keyword with an underscore, then remove the underscore
-        # for Discord's sake
-        if remove_underscore_keywords and keyword.iskeyword(param_name[:-1]):
-            # def_ -> def, in_ -> in
-            param_name_mapping[param_name[:-1]] = param_name
-            param_name = param_name[:-1]
-
-        # Get descriptions or use default
-        param_description = param_descriptions.get(
-            param_name, "No description")
-
-        # Default to no choices
-        choices = None
-        # Unions of literals are considered choices, rather than converters
-        if validate_literal_union(annotation):
-            choices = []
-            for literal in annotation.__args__:
-                # Literal[1, "My naparam_nameme"] would give choice 1, of name Name
-                choice_value = literal.__args__[0]
-                if len(literal.__args__) > 1:
-                    choice_name = literal.__args__[1]
-                else:
-                    choice_name = str(choice_value)
-                choices.append(create_choice(choice_value, choice_name))
-        else:
-            # Just use converter params
-            converter_params[param_name] = annotation
-
-        # Add the parameter/"option"
-        params['options'].append(create_option(
-            name=param_name,
-            description=param_description,
-            option_type=get_slash_command_type(annotation),
-            required=parameter.default == inspect.Parameter.empty,
-            choices=choices
-        ))
+    with profiler.record("phase", command_name, "options"):
+        for param_name, parameter in signature.parameters.items():
+            annotation = parameter.annotation
+            if annotation == SlashContext or param_name == "self":
+                continue
+
+            # If it's a keyword with an underscore, then remove the underscore
+            # for Discord's sake
+            if remove_underscore_keywords and keyword.iskeyword(param_name[:-1]):
+                # def_ -> def, in_ -> in
+                param_name_mapping[param_name[:-1]] = param_name
+                param_name = param_name[:-1]
+
+            # Get descriptions or use default
+            param_description = param_descriptions.get(
+                param_name, "No description")
+
+            # Default to no choices
+            choices = None
+            # Unions of literals are considered choices, rather than converters
+            if validate_literal_union(annotation):
+                choices = []
+                with profiler.record("phase", command_name, "choices"):
+                    for literal in annotation.__args__:
+                        # Literal[1, "My naparam_nameme"] would give choice 1, of name Name
+                        choice_value = literal.__args__[0]
+                        if len(literal.__args__) > 1:
+                            choice_name = literal.__args__[1]
+                        else:
+                            choice_name = str(choice_value)
+                        choices.append(create_choice(choice_value, choice_name))
+            else:
+                # Just use converter params
+                converter_params[param_name] = annotation
+
+            # Add the parameter/"option"
+            params['options'].append(create_option(
+                name=param_name,
+                description=param_description,
+                option_type=get_slash_command_type(annotation),
+                required=parameter.default == inspect.Parameter.empty,
+                choices=choices
+            ))
 
     params['connector'] = param_name_mapping
     return params, converter_params
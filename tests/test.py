@@ -1,8 +1,18 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
 import unittest
 from typing import Literal, Optional, Union
 
+import discord
 from discord.ext import commands
 from discord_slash.model import SlashCommandOptionType
+from pyslash.converters import BadSlashArgument, compile_validator
+from pyslash.guilds import LazyGuildSync
+from pyslash.profiler import Profiler
 from pyslash.decorators import (get_slash_command_type, get_slash_kwargs,
                                 is_optional_of)
 from pyslash.utils import is_converter, validate_literal_union
@@ -132,6 +142,360 @@ class TestPySlash(unittest.TestCase):
             "choices": []
         })
 
+    def test_validator(self):
+        def func(foo: str, bar: Union[Literal[1], Literal[2, "name"]], baz: Optional[int] = None):
+            pass
+
+        kwargs, _ = get_slash_kwargs(func)
+        validator = compile_validator(kwargs["options"], kwargs["connector"])
+
+        validator({"foo": "a", "bar": 2})
+        validator({"foo": "a", "bar": 1, "baz": 5})
+
+        with self.assertRaises(BadSlashArgument):
+            validator({"bar": 1})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a", "bar": 3})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a", "bar": 1, "baz": "5"})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a", "bar": 1, "baz": True})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a", "bar": 1, "qux": 1})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a" * 6001, "bar": 1})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a", "bar": 1, "baz": 2 ** 60})
+
+    def test_validator_bounds(self):
+        validator = compile_validator([
+            {"name": "foo", "type": SlashCommandOptionType.STRING, "required": True,
+             "choices": [], "min_length": 2, "max_length": 3},
+            {"name": "bar", "type": SlashCommandOptionType.INTEGER, "required": False,
+             "choices": [], "min_value": 0, "max_value": 10},
+        ])
+
+        validator({"foo": "ab", "bar": 10})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "a"})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "abcd"})
+        with self.assertRaises(BadSlashArgument):
+            validator({"foo": "ab", "bar": -1})
+
+    def test_validator_uncached_snowflakes(self):
+        def func(member: discord.Member, channel: discord.TextChannel, role: discord.Role):
+            pass
+
+        kwargs, _ = get_slash_kwargs(func)
+        validator = compile_validator(kwargs["options"], kwargs["connector"])
+
+        # Uncached channels and roles are None, or IDs outside of guilds
+        validator({"member": 1, "channel": None, "role": None})
+        validator({"member": "1", "channel": "2", "role": "3"})
+        with self.assertRaises(BadSlashArgument):
+            validator({"member": "foo", "channel": None, "role": None})
+
+    def test_validator_connector(self):
+        def func(in_: str):
+            pass
+
+        kwargs, _ = get_slash_kwargs(func, remove_underscore_keywords=True)
+        validator = compile_validator(kwargs["options"], kwargs["connector"])
+
+        validator({"in_": "a"})
+        with self.assertRaises(BadSlashArgument):
+            validator({})
+
+    def test_profiler(self):
+        profiler = Profiler()
+        with profiler.record("decoration", "foo"):
+            pass
+        self.assertEqual(profiler.records, [])
+
+        profiler.enable()
+        self.addCleanup(profiler.disable)
+        for _ in range(2):
+            with profiler.record("phase", "foo", "signature"):
+                pass
+        with profiler.record("decoration", "foo"):
+            with profiler.record("phase", "foo", "options"):
+                with profiler.record("phase", "foo", "choices"):
+                    # Freed before the record ends, but still allocated
+                    data = bytearray(800_000)
+                    del data
+
+        summary = profiler.summary()
+        phases = {item["phase"]: item for item in summary["phase"]}
+        self.assertEqual(phases["signature"]["count"], 2)
+        self.assertEqual(summary["decoration"][0]["name"], "foo")
+        self.assertGreaterEqual(summary["decoration"][0]["allocated"], 800_000)
+        self.assertGreaterEqual(phases["options"]["allocated"], 800_000)
+        self.assertGreaterEqual(phases["choices"]["allocated"], 800_000)
+        self.assertTrue(phases["choices"]["nested"])
+        self.assertFalse(phases["options"]["nested"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile")
+            profiler.write_report(path)
+            with open(f"{path}.json") as f:
+                self.assertIn("signature", [item["phase"] for item in json.load(f)["phase"]])
+            with open(f"{path}.txt") as f:
+                self.assertIn("foo [signature]", f.read())
+
+        profiler.disable()
+        self.assertFalse(profiler.enabled)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_profiler_concurrent(self):
+        profiler = Profiler()
+        profiler.enable()
+        self.addCleanup(profiler.disable)
+
+        async def request(guild_id):
+            with profiler.record("sync", f"PUT {guild_id}"):
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*(request(guild_id) for guild_id in range(5)))
+
+        asyncio.run(run())
+        items = profiler.summary()["sync"]
+        self.assertEqual(len(items), 5)
+        self.assertFalse(any(item["nested"] for item in items))
+        self.assertNotIn("(nested)", profiler.format_report())
+        # The total counts every request
+        total = sum(record["duration"] for record in profiler.records)
+        self.assertIn(f"sync ({total * 1000:.2f} ms)", profiler.format_report())
+
+
+class FakeRequest:
+    def __init__(self):
+        self.puts = []
+        self.attempts = 0
+        self.forbidden = set()
+        self.errors = set()
+        # Set to hold requests until it's set
+        self.gate = None
+
+    async def put_slash_commands(self, slash_commands, guild_id):
+        self.attempts += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if guild_id in self.errors:
+            raise RuntimeError("Bad Gateway")
+        if guild_id in self.forbidden:
+            response = type("Response", (), {"status": 403, "reason": "Forbidden"})()
+            raise discord.Forbidden(response, "Missing Access")
+        self.puts.append((guild_id, slash_commands))
+
+
+class FakeGuild:
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeClient:
+    def __init__(self, guild_ids):
+        self.loop = asyncio.get_event_loop()
+        self.guilds = [FakeGuild(guild_id) for guild_id in guild_ids]
+        self.listeners = {}
+
+    def get_guild(self, guild_id):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+    def add_listener(self, function, name):
+        self.listeners[name] = function
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSlash:
+    def __init__(self, guild_ids):
+        self.req = FakeRequest()
+        self._discord = FakeClient(guild_ids)
+
+
+def make_cmds(*guild_ids):
+    return {
+        "global": [],
+        "guild": {
+            guild_id: [{"name": "foo", "description": "bar", "options": []}]
+            for guild_id in guild_ids
+        }
+    }
+
+
+class TestLazyGuildSync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "guilds.json")
+
+    def make(self, guild_ids, **kwargs):
+        guild_sync = LazyGuildSync(self.path, **kwargs)
+        guild_sync.attach(FakeSlash(guild_ids))
+        self.addCleanup(guild_sync.close)
+        return guild_sync
+
+    async def test_restart_skips_registered(self):
+        guild_sync = self.make([1, 2])
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts, [(1, make_cmds(1)["guild"][1])])
+        guild_sync.close()
+
+        # Already registered, so a restart shouldn't register again
+        guild_sync = self.make([1, 2])
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts, [])
+
+    async def test_removed_commands(self):
+        guild_sync = self.make([1, 2])
+        await guild_sync.sync(make_cmds(1, 2))
+        await guild_sync.join()
+
+        # Guild 2 no longer has any commands, so they are unregistered
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts[-1], (2, []))
+        self.assertIsNone(guild_sync.registry["2"]["hash"])
+
+    async def test_priority(self):
+        with open(self.path, "w") as f:
+            json.dump({"1": {"last_active": 100}, "2": {"last_active": 300}, "3": {"last_active": 200}}, f)
+
+        guild_sync = self.make([1, 2, 3], max_concurrency=1)
+        await guild_sync.sync(make_cmds(1, 2, 3))
+        await guild_sync.join()
+        self.assertEqual([guild_id for guild_id, _ in guild_sync.slash.req.puts], [2, 3, 1])
+
+    async def test_idle(self):
+        guild_sync = self.make([1], idle_timeout=60, idle_check_interval=0.01)
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+
+        # Unregistered once idle
+        guild_sync.registry["1"]["last_active"] = time.time() - 120
+        await asyncio.sleep(0.05)
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts[-1], (1, []))
+
+        # Registered again on activity
+        message = type("Message", (), {"guild": FakeGuild(1)})()
+        await guild_sync.on_message(message)
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts[-1], (1, make_cmds(1)["guild"][1]))
+
+        guild_sync.registry["1"]["last_active"] = time.time() - 120
+        await asyncio.sleep(0.05)
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts[-1], (1, []))
+
+        ctx = type("Context", (), {"guild_id": 1})()
+        await guild_sync.on_slash_command(ctx)
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts[-1], (1, make_cmds(1)["guild"][1]))
+
+    async def test_guild_remove(self):
+        guild_sync = self.make([1])
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+
+        await guild_sync.on_guild_remove(FakeGuild(1))
+        self.assertNotIn("1", guild_sync.registry)
+
+    async def test_forbidden_removed_guild(self):
+        with open(self.path, "w") as f:
+            json.dump({"2": {"hash": "removed while offline"}}, f)
+
+        guild_sync = self.make([1])
+        guild_sync.slash.req.forbidden.add(2)
+        await guild_sync.sync(make_cmds(1))
+        guild_sync.schedule(2)
+        await guild_sync.join()
+        self.assertNotIn("2", guild_sync.registry)
+
+    async def test_corrupt_registry(self):
+        with open(self.path, "w") as f:
+            f.write('{"1": {"hash"')
+
+        with self.assertLogs("pyslash", "WARNING"):
+            guild_sync = self.make([1])
+        self.assertEqual(guild_sync.registry, {})
+
+        # Saved in one piece
+        guild_sync.save()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {})
+
+    async def test_close(self):
+        guild_sync = self.make([1])
+        await guild_sync.sync(make_cmds(1))
+        workers = guild_sync._workers
+        await guild_sync.slash._discord.close()
+        await asyncio.sleep(0)
+        self.assertTrue(all(task.cancelled() for task in workers))
+
+    async def test_forbidden_not_retried(self):
+        guild_sync = self.make([1])
+        guild_sync.slash.req.forbidden.add(1)
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+
+        message = type("Message", (), {"guild": FakeGuild(1)})()
+        for _ in range(10):
+            await guild_sync.on_message(message)
+            await guild_sync.on_guild_available(FakeGuild(1))
+            await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.attempts, 1)
+
+        # Joining again (perhaps with new access) retries
+        guild_sync.slash.req.forbidden.clear()
+        await guild_sync.on_guild_join(FakeGuild(1))
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts, [(1, make_cmds(1)["guild"][1])])
+        self.assertNotIn("failed", guild_sync.registry["1"])
+
+    async def test_error_backoff(self):
+        guild_sync = self.make([1], retry_after=0.05)
+        guild_sync.slash.req.errors.add(1)
+        await guild_sync.sync(make_cmds(1))
+        await guild_sync.join()
+
+        message = type("Message", (), {"guild": FakeGuild(1)})()
+        await guild_sync.on_message(message)
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.attempts, 1)
+
+        # Retried once the backoff is over
+        guild_sync.slash.req.errors.clear()
+        await asyncio.sleep(0.1)
+        await guild_sync.on_message(message)
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.puts, [(1, make_cmds(1)["guild"][1])])
+
+    async def test_activity_during_request(self):
+        guild_sync = self.make([1])
+        guild_sync.slash.req.gate = asyncio.Event()
+        await guild_sync.sync(make_cmds(1))
+        await asyncio.sleep(0)
+
+        # The request is in flight, so this shouldn't queue it again
+        message = type("Message", (), {"guild": FakeGuild(1)})()
+        await guild_sync.on_message(message)
+        guild_sync.slash.req.gate.set()
+        await guild_sync.join()
+        self.assertEqual(guild_sync.slash.req.attempts, 1)
+
+    async def test_close_save_failure(self):
+        self.path = os.path.join(self.path, "missing", "guilds.json")
+        guild_sync = self.make([1])
+        with self.assertLogs("pyslash", "ERROR"):
+            await guild_sync.slash._discord.close()
+        self.assertTrue(guild_sync.slash._discord.closed)
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)